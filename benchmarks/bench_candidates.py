@@ -0,0 +1,75 @@
+"""Compare one multi-candidate request with N sequential requests against a stub provider.
+
+    python benchmarks/bench_candidates.py --candidates 3
+
+The stub charges a fixed round-trip latency per request plus decode time per output token,
+and counts billed prompt/completion tokens, so no API key or network is needed.
+
+Sample run (defaults, 1500-word prompt, 450 output tokens per candidate):
+
+    3 sequential calls             3.90s  requests=3  prompt_tokens=4515  completion_tokens=1350
+    single call with n=3           1.30s  requests=1  prompt_tokens=1505  completion_tokens=1350
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main.py creates its Supabase client at import time; it is never called here
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_SERVICE_ROLE_KEY', 'bench.bench.bench')
+os.environ.setdefault('OPENAI_API_KEY', 'bench')
+
+import main  # noqa: E402
+
+
+class StubProvider:
+    def __init__(self, round_trip=0.4, seconds_per_token=0.002, output_tokens=450):
+        self.round_trip = round_trip
+        self.seconds_per_token = seconds_per_token
+        self.output_tokens = output_tokens
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def client(self, api_key=None):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+
+    def create(self, messages, n=1, **kwargs):
+        prompt_tokens = sum(len(m['content'].split()) for m in messages)
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += n * self.output_tokens
+        # Choices are decoded in parallel on the provider side
+        time.sleep(self.round_trip + self.output_tokens * self.seconds_per_token)
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(content=f'Cover letter draft {i + 1}')) for i in range(n)
+        ])
+
+
+def run(label, candidates, fn):
+    stub = StubProvider()
+    main.OpenAI = stub.client
+    start = time.perf_counter()
+    letters = fn()
+    elapsed = time.perf_counter() - start
+    assert len(letters) == candidates
+    print(f"{label:<28} {elapsed:6.2f}s  requests={stub.requests}  prompt_tokens={stub.prompt_tokens}  completion_tokens={stub.completion_tokens}")
+
+
+def main_bench(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--candidates', type=int, default=3)
+    parser.add_argument('--prompt-words', type=int, default=1500)
+    args = parser.parse_args(argv)
+    prompt = ' '.join(['resume'] * args.prompt_words)
+    n = args.candidates
+
+    run(f'{n} sequential calls', n, lambda: [main._generate_with_model('gpt-4o', prompt) for _ in range(n)])
+    run(f'single call with n={n}', n, lambda: main._generate_candidates_with_model('gpt-4o', prompt, n=n))
+
+
+if __name__ == '__main__':
+    main_bench()
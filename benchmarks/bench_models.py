@@ -0,0 +1,103 @@
+"""Compare the old eager Submission model with the lazy, row-backed one for a listing page.
+
+    python benchmarks/bench_models.py --rows 5000
+
+Each variant builds one model per row and reads the fields view_submissions.html renders.
+Memory is what tracemalloc sees allocated by that step (rows are built beforehand).
+'lazy, list columns' uses rows shaped like the Submission.LIST_COLUMNS select, which is
+what view_submissions now fetches.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main.py creates its Supabase client at import time; it is never called here
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_SERVICE_ROLE_KEY', 'bench.bench.bench')
+
+import main  # noqa: E402
+
+
+class EagerSubmission:
+    """The model as it was before utils/lazy_model.py: every column copied, created_at parsed up front."""
+
+    def __init__(self, submission_data):
+        self.id = submission_data.get('id')
+        self.resume_text = submission_data.get('resume_text')
+        self.focus_areas = submission_data.get('focus_areas')
+        self.job_description = submission_data.get('job_description')
+        self.cover_letter = submission_data.get('cover_letter')
+        self.cover_letter_candidates = submission_data.get('cover_letter_candidates') or []
+        self.company_name = submission_data.get('company_name')
+        self.job_title = submission_data.get('job_title')
+        self.user_id = submission_data.get('user_id')
+        self.created_at = datetime.fromisoformat(submission_data.get('created_at')) if submission_data.get('created_at') else datetime.utcnow()
+
+
+def make_rows(count, light=False):
+    start = datetime(2024, 1, 1)
+    list_columns = [c.strip() for c in main.Submission.LIST_COLUMNS.split(',')]
+    rows = []
+    for i in range(count):
+        row = {
+            'id': i,
+            'user_id': 1,
+            'company_name': f'Company {i}',
+            'job_title': 'Software Engineer',
+            'focus_areas': 'Distributed systems, mentoring, on-call ownership',
+            'created_at': (start + timedelta(minutes=i)).isoformat(),
+            'resume_text': f'Resume {i} ' + 'experience ' * 600,
+            'job_description': f'Job {i} ' + 'requirements ' * 400,
+            'cover_letter': f'Letter {i} ' + 'paragraph ' * 350,
+            'cover_letter_candidates': None,
+        }
+        rows.append({k: row[k] for k in list_columns} if light else row)
+    return rows
+
+
+def render_listing(submissions):
+    # The fields view_submissions.html reads for each row
+    for s in submissions:
+        s.id, s.company_name, s.job_title, s.focus_areas[:50], s.created_at.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def run(label, model, rows, repeat):
+    tracemalloc.start()
+    submissions = [model(row) for row in rows]
+    render_listing(submissions)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del submissions
+
+    build_times, render_times = [], []
+    for _ in range(repeat):
+        fresh = [dict(row) for row in rows]  # lazy models cache parsed values in their row
+        start = time.perf_counter()
+        submissions = [model(row) for row in fresh]
+        build_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        render_listing(submissions)
+        render_times.append(time.perf_counter() - start)
+    print(f"{label:<22} build {min(build_times) * 1000:7.2f}ms  build+render {min(b + r for b, r in zip(build_times, render_times)) * 1000:7.2f}ms  retained {current / 1024:8.1f} KiB")
+
+
+def main_bench(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    full_rows = make_rows(args.rows)
+    light_rows = make_rows(args.rows, light=True)
+    print(f"{args.rows} submissions")
+    run('eager, select *', EagerSubmission, full_rows, args.repeat)
+    run('lazy, select *', main.Submission, full_rows, args.repeat)
+    run('lazy, list columns', main.Submission, light_rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main_bench()
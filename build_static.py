@@ -0,0 +1,166 @@
+"""Build purged, fingerprinted and precompressed static assets into static/dist/.
+
+    python build_static.py                       # downloads Tailwind 2.2.19 once, caches it in .build_cache/
+    python build_static.py --tailwind-css tailwind.min.css
+
+Only Tailwind rules whose classes appear in templates/ or static/js/ are kept. Every
+output file is named after a hash of its content and written alongside .gz and (when the
+brotli package is installed) .br copies. static/dist/manifest.json maps logical names
+such as 'css/app.css' to the fingerprinted files; main.asset_url() reads it.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import urllib.request
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(ROOT, 'templates')
+JS_DIR = os.path.join(ROOT, 'static', 'js')
+DIST_DIR = os.path.join(ROOT, 'static', 'dist')
+CACHE_DIR = os.path.join(ROOT, '.build_cache')
+TAILWIND_URL = 'https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css'
+
+# Classes built at render time that the scanner cannot see, e.g. md:grid-cols-{{ n }} in result.html
+SAFELIST = {f'md:grid-cols-{n}' for n in range(1, 7)} | {'hidden', 'opacity-50', 'cursor-not-allowed'}
+
+CANDIDATE_RE = re.compile(r'[^<>"\'`\s]*[^<>"\'`\s:]')
+CLASS_SELECTOR_RE = re.compile(r'\.((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)')
+CSS_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6}) ?|\\(.)')
+
+
+def collect_used_classes():
+    used = set(SAFELIST)
+    for directory, suffix in ((TEMPLATES_DIR, '.html'), (JS_DIR, '.js')):
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if name.endswith(suffix):
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    used.update(CANDIDATE_RE.findall(f.read()))
+    return used
+
+
+def _unescape(css_class):
+    return CSS_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)) if m.group(1) else m.group(2), css_class)
+
+
+def _selector_used(selector, used):
+    return all(_unescape(c) in used for c in CLASS_SELECTOR_RE.findall(selector))
+
+
+def _split_blocks(css):
+    """Yield (prelude, body) for each top-level block; body is None for statements like @charset."""
+    i = 0
+    length = len(css)
+    while i < length:
+        brace = css.find('{', i)
+        semicolon = css.find(';', i)
+        if brace == -1:
+            return
+        if css[i:].lstrip().startswith('@') and semicolon != -1 and semicolon < brace:
+            yield css[i:semicolon + 1].strip(), None
+            i = semicolon + 1
+            continue
+        depth = 1
+        j = brace + 1
+        while j < length and depth:
+            if css[j] == '{':
+                depth += 1
+            elif css[j] == '}':
+                depth -= 1
+            j += 1
+        yield css[i:brace].strip(), css[brace + 1:j - 1]
+        i = j
+
+
+def purge_css(css, used):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    out = []
+    for prelude, body in _split_blocks(css):
+        if body is None:
+            out.append(prelude)
+        elif prelude.startswith(('@media', '@supports')):
+            inner = purge_css(body, used)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            # @keyframes, @font-face, @page: keep as-is
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in prelude.split(',') if _selector_used(s, used)]
+            if selectors:
+                out.append(f"{','.join(s.strip() for s in selectors)}{{{body.strip()}}}")
+    return ''.join(out)
+
+
+def load_tailwind(path=None):
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    cached = os.path.join(CACHE_DIR, 'tailwind-2.2.19.min.css')
+    if not os.path.exists(cached):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        print(f"Downloading {TAILWIND_URL}")
+        with urllib.request.urlopen(TAILWIND_URL) as response, open(cached, 'wb') as f:
+            shutil.copyfileobj(response, f)
+    with open(cached, encoding='utf-8') as f:
+        return f.read()
+
+
+def write_asset(logical_name, data, manifest):
+    """Write data under a content-hashed name plus precompressed copies and record it in the manifest."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem, ext = os.path.splitext(logical_name)
+    hashed_name = f'{stem}.{digest}{ext}'
+    path = os.path.join(DIST_DIR, hashed_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+    manifest[logical_name] = hashed_name
+    print(f"{logical_name:<20} -> {hashed_name} ({len(data):,} bytes, {os.path.getsize(path + '.gz'):,} gzipped)")
+
+
+def build(tailwind_css=None):
+    if brotli is None:
+        print("warning: brotli is not installed (pip install -r requirements.txt); writing .gz copies only")
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    manifest = {}
+    source = load_tailwind(tailwind_css)
+    purged = purge_css(source, collect_used_classes())
+    print(f"Purged Tailwind from {len(source):,} to {len(purged):,} bytes")
+    write_asset('css/app.css', purged.encode('utf-8'), manifest)
+    if os.path.isdir(JS_DIR):
+        for name in sorted(os.listdir(JS_DIR)):
+            if name.endswith('.js'):
+                with open(os.path.join(JS_DIR, name), 'rb') as f:
+                    write_asset(f'js/{name}', f.read(), manifest)
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build purged, fingerprinted, precompressed static assets.')
+    parser.add_argument('--tailwind-css', help='Path to an unpurged tailwind.min.css (downloaded if omitted)')
+    args = parser.parse_args(argv)
+    build(args.tailwind_css)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,515 @@
+"""Bulk export/import of the app's Postgres tables.
+
+Replaces the old row-by-row CSV scripts. Tables are streamed with
+COPY ... TO/FROM STDIN in id-ranged chunks, so memory use stays flat and an
+interrupted run picks up at the last completed chunk.
+
+    python db_migrate.py export --source-dsn "$SOURCE_DATABASE_URL" --data-dir dump/
+    python db_migrate.py import --target-dsn "$TARGET_DATABASE_URL" --data-dir dump/
+    python db_migrate.py schema --dsn "$TARGET_DATABASE_URL"
+    python db_migrate.py check-plans --dsn postgresql://localhost/app_dev
+    python db_migrate.py backfill-bands --dsn "$TARGET_DATABASE_URL"
+    python db_migrate.py bench  --dsn postgresql://localhost/bench --rows 2000000
+
+An empty DSN falls back to the standard PG* environment variables.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from psycopg2 import sql
+
+from utils.similarity import lsh_band_hashes, text_fingerprint
+
+# Foreign keys: resume.user_id -> user.id, submission.user_id -> user.id,
+# submission_revision.submission_id -> submission.id
+TABLE_DEPENDENCIES = {
+    'user': [],
+    'resume': ['user'],
+    'submission': ['user'],
+    'submission_revision': ['submission', 'user'],
+}
+DEFAULT_CHUNK_ROWS = 250_000
+STATE_FILENAME = '.migrate_state.json'
+# Lives in the target database so a chunk and its progress row commit together
+IMPORT_PROGRESS_TABLE = 'migration_import_progress'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Queries issued on every login, password reset and listing page. Each must be index-backed.
+HOT_QUERIES = [
+    ('load_user', 'SELECT * FROM "user" WHERE id = %s', (1,)),
+    ('login', 'SELECT * FROM "user" WHERE username = %s', ('someone',)),
+    ('register', 'SELECT id FROM "user" WHERE username = %s', ('someone',)),
+    ('forgot_password', 'SELECT * FROM "user" WHERE email = %s', ('someone@example.com',)),
+    ('reset_password', 'SELECT * FROM "user" WHERE reset_token = %s', ('token',)),
+    ('submit_resumes', 'SELECT * FROM resume WHERE user_id = %s ORDER BY created_at DESC', (1,)),
+    ('view_submissions', 'SELECT * FROM submission WHERE user_id = %s ORDER BY created_at DESC', (1,)),
+    ('get_submission', 'SELECT * FROM submission WHERE id = %s', (1,)),
+    ('submit_idempotency_key', 'SELECT id FROM submission WHERE user_id = %s AND idempotency_key = %s', (1, 'key')),
+    ('result_revisions', 'SELECT * FROM submission_revision WHERE submission_id = %s ORDER BY created_at DESC', (1,)),
+    ('similar_submissions', 'SELECT id, job_description FROM submission WHERE user_id = %s AND job_description_bands && %s::bigint[] LIMIT 50', (1, [1, 2])),
+    ('search_submissions', "SELECT id FROM submission WHERE user_id = %s AND search_vector @@ websearch_to_tsquery('english', %s)", (1, 'python')),
+]
+
+
+def connect(dsn):
+    return psycopg2.connect(dsn or '')
+
+
+def dependency_levels(tables):
+    """Group tables so that every table comes after the tables it references."""
+    remaining = list(tables)
+    done = set()
+    levels = []
+    while remaining:
+        level = [t for t in remaining if all(d in done or d not in tables for d in TABLE_DEPENDENCIES.get(t, []))]
+        if not level:
+            raise ValueError(f"Circular foreign key dependencies between: {remaining}")
+        levels.append(level)
+        done.update(level)
+        remaining = [t for t in remaining if t not in done]
+    return levels
+
+
+class MigrationState:
+    """Progress file recording completed export chunks, shared by worker threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._data = json.load(f)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def _chunk_bounds(conn, table, chunk_rows):
+    """Stream ids through a server-side cursor and return the lower bound of every chunk."""
+    bounds = []
+    with conn.cursor(name=f'ids_{table}') as cursor:
+        cursor.itersize = 50_000
+        cursor.execute(sql.SQL('SELECT id FROM {} ORDER BY id').format(sql.Identifier(table)))
+        for i, (row_id,) in enumerate(cursor):
+            if i % chunk_rows == 0:
+                bounds.append(row_id)
+    return bounds
+
+
+def _copy_columns(conn, table):
+    """Columns COPY can write back: generated columns (e.g. submission.search_vector) are rebuilt on import."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+            ORDER BY attnum""", (sql.Identifier(table).as_string(conn),))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def export_table(dsn, table, data_dir, state, chunk_rows, snapshot_id=None):
+    table_dir = os.path.join(data_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+    conn = connect(dsn)
+    try:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cursor:
+            if snapshot_id:
+                cursor.execute('SET TRANSACTION SNAPSHOT %s', (snapshot_id,))
+
+        parts = state.get(f'export:{table}:parts')
+        if parts is None:
+            bounds = _chunk_bounds(conn, table, chunk_rows)
+            parts = [[lo, bounds[i + 1] if i + 1 < len(bounds) else None] for i, lo in enumerate(bounds)]
+            state.set(f'export:{table}:parts', parts)
+
+        columns = sql.SQL(', ').join(sql.Identifier(c) for c in _copy_columns(conn, table))
+        rows_exported = 0
+        for index, (lo, hi) in enumerate(parts):
+            part_name = f'part-{index:05d}.csv'
+            if state.get(f'export:{table}:{part_name}'):
+                continue
+            where = sql.SQL('id >= {}').format(sql.Literal(lo))
+            if hi is not None:
+                where = sql.SQL('{} AND id < {}').format(where, sql.Literal(hi))
+            copy_sql = sql.SQL('COPY (SELECT {} FROM {} WHERE {} ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER true)').format(
+                columns, sql.Identifier(table), where)
+            part_path = os.path.join(table_dir, part_name)
+            with open(part_path + '.partial', 'w', newline='', encoding='utf-8') as f, conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql.as_string(conn), f)
+                rows_exported += cursor.rowcount
+            os.replace(part_path + '.partial', part_path)
+            state.set(f'export:{table}:{part_name}', True)
+        conn.rollback()
+        print(f"Exported {table}: {len(parts)} chunk(s), {rows_exported} new row(s)")
+        return rows_exported
+    finally:
+        conn.close()
+
+
+def _dump_id(state):
+    """Identifies one export, so import progress from an older dump is never mistaken for this one."""
+    dump_id = state.get('dump_id')
+    if dump_id is None:
+        dump_id = uuid.uuid4().hex
+        state.set('dump_id', dump_id)
+    return dump_id
+
+
+def export_tables(dsn, tables, data_dir, chunk_rows=DEFAULT_CHUNK_ROWS, parallel=4):
+    os.makedirs(data_dir, exist_ok=True)
+    state = MigrationState(os.path.join(data_dir, STATE_FILENAME))
+    _dump_id(state)
+    # Export every table from one consistent snapshot
+    snapshot_conn = connect(dsn)
+    try:
+        snapshot_conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with snapshot_conn.cursor() as cursor:
+            cursor.execute('SELECT pg_export_snapshot()')
+            snapshot_id = cursor.fetchone()[0]
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = [pool.submit(export_table, dsn, table, data_dir, state, chunk_rows, snapshot_id) for table in tables]
+            return sum(f.result() for f in futures)
+    finally:
+        snapshot_conn.close()
+
+
+def _reset_id_sequence(cursor, table):
+    cursor.execute(
+        sql.SQL("SELECT setval(pg_get_serial_sequence({}, 'id'), COALESCE(MAX(id), 1)) FROM {}").format(
+            sql.Literal(f'"{table}"'), sql.Identifier(table)))
+
+
+def _ensure_import_progress_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} (
+                dump_id text NOT NULL,
+                table_name text NOT NULL,
+                part_name text NOT NULL,
+                row_count bigint NOT NULL,
+                imported_at timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (dump_id, table_name, part_name)
+            )""").format(sql.Identifier(IMPORT_PROGRESS_TABLE)))
+    conn.commit()
+
+
+def _imported_parts(conn, dump_id, table=None):
+    with conn.cursor() as cursor:
+        query = sql.SQL('SELECT part_name FROM {} WHERE dump_id = %s').format(sql.Identifier(IMPORT_PROGRESS_TABLE))
+        params = [dump_id]
+        if table is not None:
+            query = sql.SQL('{} AND table_name = %s').format(query)
+            params.append(table)
+        cursor.execute(query, params)
+        return {row[0] for row in cursor.fetchall()}
+
+
+def import_table(dsn, table, data_dir, dump_id):
+    table_dir = os.path.join(data_dir, table)
+    part_names = sorted(p for p in os.listdir(table_dir) if p.endswith('.csv')) if os.path.isdir(table_dir) else []
+    conn = connect(dsn)
+    try:
+        done = _imported_parts(conn, dump_id, table)
+        rows_imported = 0
+        for part_name in part_names:
+            if part_name in done:
+                continue
+            part_path = os.path.join(table_dir, part_name)
+            part_rows = 0
+            with open(part_path, newline='', encoding='utf-8') as f, conn.cursor() as cursor:
+                header = f.readline().strip()
+                if header:
+                    f.seek(0)
+                    columns = sql.SQL(', ').join(sql.Identifier(c) for c in header.split(','))
+                    copy_sql = sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)').format(
+                        sql.Identifier(table), columns)
+                    cursor.copy_expert(copy_sql.as_string(conn), f)
+                    part_rows = cursor.rowcount
+                cursor.execute(
+                    sql.SQL('INSERT INTO {} (dump_id, table_name, part_name, row_count) VALUES (%s, %s, %s, %s)').format(
+                        sql.Identifier(IMPORT_PROGRESS_TABLE)),
+                    (dump_id, table, part_name, part_rows))
+            # The chunk and its progress row commit together, so a resumed run never loads a chunk twice
+            conn.commit()
+            rows_imported += part_rows
+        with conn.cursor() as cursor:
+            _reset_id_sequence(cursor, table)
+        conn.commit()
+        print(f"Imported {table}: {len(part_names)} chunk(s), {rows_imported} new row(s)")
+        return rows_imported
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def import_tables(dsn, tables, data_dir, parallel=4, truncate=False):
+    dump_id = _dump_id(MigrationState(os.path.join(data_dir, STATE_FILENAME)))
+    conn = connect(dsn)
+    try:
+        _ensure_import_progress_table(conn)
+        # Only truncate on a fresh run; a resumed run keeps the chunks it already loaded
+        if truncate and not _imported_parts(conn, dump_id):
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL('TRUNCATE {} RESTART IDENTITY CASCADE').format(
+                    sql.SQL(', ').join(sql.Identifier(t) for t in tables)))
+            conn.commit()
+    finally:
+        conn.close()
+    total = 0
+    for level in dependency_levels(tables):
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = [pool.submit(import_table, dsn, table, data_dir, dump_id) for table in level]
+            total += sum(f.result() for f in futures)
+    return total
+
+
+def pending_migrations(applied):
+    names = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith('.sql'))
+    return [name for name in names if name.split('_', 1)[0] not in applied]
+
+
+def apply_migrations(dsn):
+    """Apply migrations/NNNN_*.sql in order, each in its own transaction, recording them in schema_migrations."""
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version text PRIMARY KEY,
+                    name text NOT NULL,
+                    applied_at timestamptz NOT NULL DEFAULT now()
+                )""")
+            conn.commit()
+            cursor.execute('SELECT version FROM schema_migrations')
+            applied = {row[0] for row in cursor.fetchall()}
+        for name in pending_migrations(applied):
+            with open(os.path.join(MIGRATIONS_DIR, name), encoding='utf-8') as f:
+                migration_sql = f.read()
+            with conn.cursor() as cursor:
+                cursor.execute(migration_sql)
+                cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                               (name.split('_', 1)[0], name))
+            conn.commit()
+            print(f"Applied migration {name}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def backfill_job_description_bands(dsn, batch_rows=1000):
+    """Fill submission.job_description_bands for rows created before migration 0008, in id order."""
+    conn = connect(dsn)
+    last_id = 0
+    updated = 0
+    try:
+        while True:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id, job_description, resume_text FROM submission
+                    WHERE id > %s AND job_description_bands IS NULL ORDER BY id LIMIT %s""", (last_id, batch_rows))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                # Same keys main.job_description_bands() writes on insert
+                cursor.executemany('UPDATE submission SET job_description_bands = %s WHERE id = %s', [
+                    (lsh_band_hashes(job_description or '', group=text_fingerprint(resume_text)), row_id)
+                    for row_id, job_description, resume_text in rows])
+            conn.commit()
+            last_id = rows[-1][0]
+            updated += len(rows)
+        print(f"Backfilled job_description_bands for {updated} submission(s)")
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _plan_node_types(plan):
+    yield plan['Node Type'], plan.get('Relation Name')
+    for child in plan.get('Plans', []):
+        yield from _plan_node_types(child)
+
+
+def check_query_plans(dsn, queries=HOT_QUERIES):
+    """EXPLAIN every hot query and return the ones that fall back to a sequential scan.
+
+    Sequential scans are disabled for the session, so on a small development database the
+    planner still picks an index whenever one can serve the query; a Seq Scan in the plan
+    means no usable index exists.
+    """
+    conn = connect(dsn)
+    failures = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            for name, query, params in queries:
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + query, params)
+                plan = cursor.fetchone()[0][0]['Plan']
+                seq_scans = [relation for node_type, relation in _plan_node_types(plan) if node_type == 'Seq Scan']
+                status = 'FAIL' if seq_scans else 'ok'
+                print(f"{status:<5} {name:<20} {plan['Node Type']}" + (f" (seq scan on {', '.join(seq_scans)})" if seq_scans else ''))
+                if seq_scans:
+                    failures.append(name)
+        conn.rollback()
+    finally:
+        conn.close()
+    return failures
+
+
+def _bench_dsn(dsn, schema):
+    return f"{dsn} options='-c search_path={schema}'"
+
+
+def _timed(label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {rows:>10} rows  {elapsed:8.2f}s  {rows / elapsed if elapsed else 0:>12,.0f} rows/s")
+    return elapsed
+
+
+LEGACY_SUBMISSION_COLUMNS = ('id', 'resume_text', 'focus_areas', 'job_description', 'cover_letter',
+                             'company_name', 'job_title', 'user_id', 'created_at')
+
+
+def run_bench(dsn, rows, data_dir, legacy_sample=20_000):
+    """Compare COPY-based migration with the old row-by-row scripts on synthetic data."""
+    users = max(rows // 100, 1)
+    shutil.rmtree(data_dir, ignore_errors=True)
+    conn = connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        for schema in ('migrate_bench_src', 'migrate_bench_dst'):
+            cursor.execute(sql.SQL('DROP SCHEMA IF EXISTS {} CASCADE').format(sql.Identifier(schema)))
+            cursor.execute(sql.SQL('CREATE SCHEMA {}').format(sql.Identifier(schema)))
+            apply_migrations(_bench_dsn(dsn, schema))
+        cursor.execute('SET search_path TO migrate_bench_src')
+        print(f"Generating {users} users, {rows} resumes and {rows} submissions...")
+        cursor.execute("""
+            INSERT INTO "user" (username, email, first_name, last_name, password_hash, ai_model)
+            SELECT 'user' || g, 'user' || g || '@example.com', 'First', 'Last', md5(g::text), 'gemini-2.5-pro'
+            FROM generate_series(1, %s) g""", (users,))
+        cursor.execute("""
+            INSERT INTO resume (filename, content, user_id, created_at)
+            SELECT 'resume' || g || '.pdf', repeat(md5(g::text), 40), 1 + g %% %s, now() - g * interval '1 second'
+            FROM generate_series(1, %s) g""", (users, rows))
+        cursor.execute("""
+            INSERT INTO submission (resume_text, focus_areas, job_description, cover_letter,
+                                    company_name, job_title, user_id, created_at)
+            SELECT repeat(md5(g::text), 40), 'Python, SQL', repeat(md5((g + 1)::text), 30),
+                   repeat(md5((g + 2)::text), 60), 'Company ' || g %% 500, 'Engineer', 1 + g %% %s,
+                   now() - g * interval '1 second'
+            FROM generate_series(1, %s) g""", (users, rows))
+    conn.close()
+
+    src = _bench_dsn(dsn, 'migrate_bench_src')
+    dst = _bench_dsn(dsn, 'migrate_bench_dst')
+    tables = list(TABLE_DEPENDENCIES)
+    total_rows = users + 2 * rows
+
+    def legacy_export():
+        legacy = connect(src)
+        with legacy.cursor() as cursor:
+            cursor.execute('SELECT * FROM submission ORDER BY id LIMIT %s', (legacy_sample,))
+            cursor.fetchall()
+        legacy.close()
+
+    def legacy_import():
+        # The columns the old upload script wrote, named so later migrations don't shift them
+        columns = sql.SQL(', ').join(sql.Identifier(c) for c in LEGACY_SUBMISSION_COLUMNS)
+        insert_sql = sql.SQL('INSERT INTO submission ({}) VALUES ({})').format(
+            columns, sql.SQL(', ').join(sql.Placeholder() for _ in LEGACY_SUBMISSION_COLUMNS))
+        legacy = connect(dst)
+        with legacy.cursor() as cursor:
+            cursor.execute(sql.SQL('SELECT {} FROM migrate_bench_src.submission ORDER BY id LIMIT %s').format(columns),
+                           (legacy_sample,))
+            sample = cursor.fetchall()
+            cursor.execute('INSERT INTO "user" SELECT * FROM migrate_bench_src."user"')
+            for row in sample:
+                cursor.execute(insert_sql, row)
+        legacy.rollback()
+        legacy.close()
+
+    _timed('legacy fetchall export (sample)', legacy_sample, legacy_export)
+    _timed('legacy row-by-row insert (sample)', legacy_sample, legacy_import)
+    _timed('COPY export (all tables)', total_rows, lambda: export_tables(src, tables, data_dir))
+    _timed('COPY import (all tables)', total_rows, lambda: import_tables(dst, tables, data_dir))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk COPY-based export/import of the app database.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Stream tables to chunked CSV files')
+    export_parser.add_argument('--source-dsn', default=os.getenv('SOURCE_DATABASE_URL', ''))
+    export_parser.add_argument('--data-dir', default='db_export')
+    export_parser.add_argument('--tables', nargs='+', default=list(TABLE_DEPENDENCIES))
+    export_parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    export_parser.add_argument('--parallel', type=int, default=4)
+
+    import_parser = subparsers.add_parser('import', help='Load chunked CSV files in foreign key order')
+    import_parser.add_argument('--target-dsn', default=os.getenv('TARGET_DATABASE_URL', ''))
+    import_parser.add_argument('--data-dir', default='db_export')
+    import_parser.add_argument('--tables', nargs='+', default=list(TABLE_DEPENDENCIES))
+    import_parser.add_argument('--parallel', type=int, default=4)
+    import_parser.add_argument('--truncate', action='store_true', help='Empty the target tables before a fresh import')
+
+    schema_parser = subparsers.add_parser('schema', help='Apply pending schema migrations')
+    schema_parser.add_argument('--dsn', default=os.getenv('DATABASE_URL', ''))
+
+    plans_parser = subparsers.add_parser('check-plans', help='Fail if a hot query needs a sequential scan')
+    plans_parser.add_argument('--dsn', default=os.getenv('DATABASE_URL', ''))
+
+    backfill_parser = subparsers.add_parser('backfill-bands', help='Compute near-duplicate keys for older submissions')
+    backfill_parser.add_argument('--dsn', default=os.getenv('DATABASE_URL', ''))
+
+    bench_parser = subparsers.add_parser('bench', help='Benchmark against a local scratch database')
+    bench_parser.add_argument('--dsn', default=os.getenv('BENCH_DATABASE_URL', ''))
+    bench_parser.add_argument('--rows', type=int, default=2_000_000)
+    bench_parser.add_argument('--data-dir', default='db_bench_export')
+
+    args = parser.parse_args(argv)
+    if args.command == 'export':
+        export_tables(args.source_dsn, args.tables, args.data_dir, args.chunk_rows, args.parallel)
+    elif args.command == 'import':
+        import_tables(args.target_dsn, args.tables, args.data_dir, args.parallel, args.truncate)
+    elif args.command == 'schema':
+        apply_migrations(args.dsn)
+    elif args.command == 'check-plans':
+        failures = check_query_plans(args.dsn)
+        if failures:
+            print(f"{len(failures)} hot query(ies) fall back to a sequential scan: {', '.join(failures)}")
+            return 1
+    elif args.command == 'backfill-bands':
+        backfill_job_description_bands(args.dsn)
+    elif args.command == 'bench':
+        run_bench(args.dsn, args.rows, args.data_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import os
+import multiprocessing
+
+# Production entry point: gunicorn -c gunicorn.conf.py main:app
+# SECRET_KEY must be set so every worker signs sessions with the same key.
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# sync, gthread or gevent (gevent requires the gevent package)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+if worker_class == 'gthread':
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+elif worker_class == 'gevent':
+    worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '100'))
+
+# A per-process fallback key would log users out whenever a request lands on another worker
+if workers > 1 and not os.getenv('SECRET_KEY'):
+    raise RuntimeError('SECRET_KEY must be set when running more than one gunicorn worker')
+
+# Generations can take a while (extraction + LLM call + retries)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '180'))
+# How long a worker gets to finish in-flight requests (including generations) after SIGTERM
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '90'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
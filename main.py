@@ -1,11 +1,22 @@
 import os
 import json
 import time
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_file
+import threading
+import re
+import mimetypes
+import uuid
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_file, abort, g, has_request_context
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, safe_join
 from utils.pdf_processor import extract_text_from_pdf
+from utils.similarity import lsh_band_hashes, rank_near_duplicates, text_fingerprint
+from utils.search import SubmissionSearchIndex, HIGHLIGHT_START, HIGHLIGHT_STOP
+from utils.resume_digest import RESUME_DIGEST_VERSION, build_resume_digest, format_resume_digest
+from utils.single_flight import SingleFlight
+from utils.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from utils.structured_logging import configure_logging
+from utils.lazy_model import Column, LazyModel, parse_datetime
 from openai import OpenAI
 from openai import RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 try:
@@ -23,6 +34,9 @@ import secrets
 from flask_mail import Mail, Message
 from supabase import create_client, Client
 from typing import Optional
+from markupsafe import escape
+from contextlib import contextmanager
+from collections import OrderedDict
 try:
     import google.generativeai as genai
 except Exception:
@@ -32,15 +46,56 @@ try:
 except Exception:
     HarmCategory = None
     HarmBlockThreshold = None
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+try:
+    from flask_session import Session
+except Exception:
+    Session = None
+
+def _current_request_id():
+    return g.get('request_id') if has_request_context() else None
+
+# Records are queued on the request thread and written by a background listener thread.
+# Per-stage progress lines go to the `.stages` child logger and are sampled per request
+# with LOG_STAGE_SAMPLE_RATE (0.0-1.0); warnings and errors are never sampled.
+configure_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    json_output=os.getenv('LOG_FORMAT', 'json') == 'json',
+    stage_sample_rate=float(os.getenv('LOG_STAGE_SAMPLE_RATE', '1.0')),
+    stage_loggers=(f'{__name__}.stages',),
+    get_request_id=_current_request_id,
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+)
 logger = logging.getLogger(__name__)
+stage_logger = logging.getLogger(f'{__name__}.stages')
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# Every worker/instance must sign sessions with the same key, otherwise a cookie
+# issued by one process is rejected by the next one and the user is logged out.
+secret_key = os.getenv('SECRET_KEY')
+if not secret_key:
+    logger.warning("SECRET_KEY is not set; falling back to a per-process key. Sessions will not be shared across workers or restarts.")
+    secret_key = os.urandom(24)
+app.secret_key = secret_key
 app.config['UPLOAD_FOLDER'] = '/tmp'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
+# Optional server-side session storage (SESSION_TYPE=redis or filesystem)
+session_type = os.getenv('SESSION_TYPE')
+if session_type:
+    if Session is None:
+        logger.warning(f"SESSION_TYPE={session_type} requested but Flask-Session is not installed; using cookie sessions.")
+    else:
+        app.config['SESSION_TYPE'] = session_type
+        app.config['SESSION_PERMANENT'] = False
+        app.config['SESSION_USE_SIGNER'] = True
+        app.config['SESSION_KEY_PREFIX'] = os.getenv('SESSION_KEY_PREFIX', 'coverletter:')
+        if session_type == 'redis':
+            import redis
+            app.config['SESSION_REDIS'] = redis.from_url(os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0'))
+        elif session_type == 'filesystem':
+            app.config['SESSION_FILE_DIR'] = os.getenv('SESSION_FILE_DIR', '/tmp/flask_session')
+        Session(app)
+
 # Initialize Supabase client
 supabase: Client = create_client(
     os.getenv('SUPABASE_URL'),
@@ -72,6 +127,29 @@ def _giveup_on_non_retryable(e: Exception) -> bool:
     return False
 
 
+def _is_provider_failure(e: Exception) -> bool:
+    """Whether an error says the provider is unhealthy (as opposed to a bad request from us)."""
+    status_code = getattr(e, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(e, 'code', None)
+    if not isinstance(status_code, int):
+        return True
+    return status_code in (408, 429) or status_code >= 500
+
+
+# One breaker per provider/model, e.g. 'openai:gpt-4o' or 'gemini:gemini-2.5-pro'
+circuit_breakers = CircuitBreakerRegistry(
+    error_rate=float(os.getenv('CIRCUIT_BREAKER_ERROR_RATE', '0.5')),
+    min_calls=int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', '5')),
+    window=int(os.getenv('CIRCUIT_BREAKER_WINDOW', '20')),
+    open_seconds=float(os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', '30')),
+    half_open_trials=int(os.getenv('CIRCUIT_BREAKER_HALF_OPEN_TRIALS', '1')),
+    is_failure=_is_provider_failure,
+)
+# Model to route generations to while the user's model is failing fast, e.g. gpt-4o
+LLM_FALLBACK_MODEL = os.getenv('LLM_FALLBACK_MODEL')
+
+
 @backoff.on_exception(
     backoff.expo,
     (
@@ -87,13 +165,38 @@ def _giveup_on_non_retryable(e: Exception) -> bool:
     on_backoff=_log_backoff,
 )
 def _openai_chat_create_with_backoff(client: OpenAI, **kwargs):
-    return client.chat.completions.create(**kwargs)
+    # Each attempt goes through the breaker. CircuitOpenError is not retried, so once
+    # the circuit opens the remaining retries stop immediately.
+    breaker = circuit_breakers.get(f"openai:{kwargs.get('model')}")
+    return breaker.call(client.chat.completions.create, **kwargs)
+
+# Number of generations running in this worker, reported by /internal/health
+_inflight_lock = threading.Lock()
+_inflight_generations = 0
+
+
+@contextmanager
+def _track_inflight_generation():
+    global _inflight_generations
+    with _inflight_lock:
+        _inflight_generations += 1
+    try:
+        yield
+    finally:
+        with _inflight_lock:
+            _inflight_generations -= 1
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 ALLOWED_EXTENSIONS = {'pdf'} 
+MAX_CANDIDATES = int(os.getenv('MAX_CANDIDATES', '3'))
+# Output budget for rewriting one paragraph, versus 2000 for a whole letter
+PARAGRAPH_MAX_TOKENS = int(os.getenv('PARAGRAPH_MAX_TOKENS', '300'))
+# Gemini 2.5 counts thinking tokens against max_output_tokens, so a capped call (cap_gemini_output=True)
+# gets max_tokens plus this allowance
+GEMINI_THINKING_TOKENS = int(os.getenv('GEMINI_THINKING_TOKENS', '2048'))
 
 COVERLETTER_FORMAT = (
     "On the first line (line 1) include the candidate name and nothing else. On the next line (line 2), "
@@ -126,18 +229,27 @@ def get_db_connection():
             logger.error(f"Unexpected database error: {str(e)}")
             raise
 
-class User(UserMixin):
-    def __init__(self, user_data):
-        self.id = user_data.get('id')
-        self.username = user_data.get('username')
-        self.email = user_data.get('email')
-        self.first_name = user_data.get('first_name')
-        self.last_name = user_data.get('last_name')
-        self.password_hash = user_data.get('password_hash')
-        self.ai_model = user_data.get('ai_model', 'gemini-2.5-pro')
-        self.reset_token = user_data.get('reset_token')
-        self.reset_token_expiration = user_data.get('reset_token_expiration')
-        self.cover_letter_format = user_data.get('cover_letter_format', COVERLETTER_FORMAT)
+class SupabaseModel(LazyModel):
+    """Wraps a Supabase row without copying it; see utils/lazy_model.py."""
+    __slots__ = ()
+    table = None
+
+    def fetch_columns(self, row_id, columns):
+        response = supabase.table(self.table).select(', '.join(columns)).eq('id', row_id).execute()
+        return response.data[0] if response.data else {}
+
+class User(SupabaseModel, UserMixin):
+    table = 'user'
+    id = Column()
+    username = Column()
+    email = Column()
+    first_name = Column()
+    last_name = Column()
+    password_hash = Column()
+    ai_model = Column(default='gemini-2.5-pro')
+    reset_token = Column()
+    reset_token_expiration = Column()
+    cover_letter_format = Column(default=COVERLETTER_FORMAT)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -147,6 +259,8 @@ class User(UserMixin):
 
     def delete_account(self):
         try:
+            # Delete all revisions
+            supabase.table('submission_revision').delete().eq('user_id', self.id).execute()
             # Delete all submissions
             supabase.table('submission').delete().eq('user_id', self.id).execute()
             # Delete all resumes
@@ -179,17 +293,21 @@ class User(UserMixin):
             return False
         return True
 
-class Submission:
-    def __init__(self, submission_data):
-        self.id = submission_data.get('id')
-        self.resume_text = submission_data.get('resume_text')
-        self.focus_areas = submission_data.get('focus_areas')
-        self.job_description = submission_data.get('job_description')
-        self.cover_letter = submission_data.get('cover_letter')
-        self.company_name = submission_data.get('company_name')
-        self.job_title = submission_data.get('job_title')
-        self.user_id = submission_data.get('user_id')
-        self.created_at = datetime.fromisoformat(submission_data.get('created_at')) if submission_data.get('created_at') else datetime.utcnow()
+class Submission(SupabaseModel):
+    __slots__ = ()
+    table = 'submission'
+    # Listings select LIST_COLUMNS; the large text columns are fetched on first access
+    LIST_COLUMNS = 'id, user_id, company_name, job_title, focus_areas, created_at'
+    id = Column()
+    resume_text = Column(deferred=True)
+    focus_areas = Column()
+    job_description = Column(deferred=True)
+    cover_letter = Column(deferred=True)
+    cover_letter_candidates = Column(parse=lambda value: value or [], deferred=True)
+    company_name = Column()
+    job_title = Column()
+    user_id = Column()
+    created_at = Column(parse=parse_datetime)
 
     @staticmethod
     def get_by_id(submission_id):
@@ -202,13 +320,28 @@ class Submission:
             logger.error(f"Error getting submission: {str(e)}")
             return None
 
-class Resume:
-    def __init__(self, resume_data):
-        self.id = resume_data.get('id')
-        self.filename = resume_data.get('filename')
-        self.content = resume_data.get('content')
-        self.user_id = resume_data.get('user_id')
-        self.created_at = datetime.fromisoformat(resume_data.get('created_at')) if resume_data.get('created_at') else datetime.utcnow()
+class Resume(SupabaseModel):
+    __slots__ = ()
+    table = 'resume'
+    LIST_COLUMNS = 'id, user_id, filename, created_at'
+    id = Column()
+    filename = Column()
+    content = Column(deferred=True)
+    digest = Column(deferred=True)
+    user_id = Column()
+    created_at = Column(parse=parse_datetime)
+
+    def prompt_text(self):
+        """Compact resume text for prompts, building and saving the digest for resumes uploaded before it existed."""
+        digest = json.loads(self.digest) if isinstance(self.digest, str) else self.digest
+        if not digest or digest.get('version') != RESUME_DIGEST_VERSION:
+            digest = build_resume_digest(self.content)
+            try:
+                supabase.table('resume').update({'digest': digest}).eq('id', self.id).execute()
+            except Exception as e:
+                logger.error(f"Error saving resume digest: {str(e)}")
+            self.digest = digest
+        return format_resume_digest(digest) or self.content
 
     @staticmethod
     def get_by_id(resume_id):
@@ -235,7 +368,16 @@ def load_user(user_id):
 def _is_google_model(model_name: str) -> bool:
     return isinstance(model_name, str) and model_name.lower().startswith('gemini')
 
-def _generate_with_model(model_name: str, prompt: str, temperature: float = 0.7, max_tokens: int = 2000) -> str:
+def _generate_with_model(model_name: str, prompt: str, temperature: float = 0.7, max_tokens: int = 2000, cap_gemini_output: bool = False) -> str:
+    return _generate_candidates_with_model(model_name, prompt, n=1, temperature=temperature, max_tokens=max_tokens,
+                                           cap_gemini_output=cap_gemini_output)[0]
+
+def _generate_candidates_with_model(model_name: str, prompt: str, n: int = 1, temperature: float = 0.7, max_tokens: int = 2000, allow_fallback: bool = True, cap_gemini_output: bool = False) -> list:
+    """Ask the provider for up to n alternative completions of the same prompt in a single request.
+
+    max_tokens always caps OpenAI. Gemini is only capped when cap_gemini_output is set, since
+    its thinking shares the budget and a full letter could otherwise be cut short.
+    """
     try:
         if _is_google_model(model_name):
             if genai is None:
@@ -260,31 +402,38 @@ def _generate_with_model(model_name: str, prompt: str, temperature: float = 0.7,
                     {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_ONLY_HIGH"},
                     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"},
                 ]
-            response = model.generate_content(
+            generation_config = {
+                'temperature': temperature,
+                'candidate_count': n
+            }
+            if cap_gemini_output:
+                generation_config['max_output_tokens'] = max_tokens + GEMINI_THINKING_TOKENS
+            response = circuit_breakers.get(f"gemini:{model_name}").call(
+                model.generate_content,
                 prompt,
-                generation_config={
-                    'temperature': temperature
-                },
+                generation_config=generation_config,
                 safety_settings=safety_settings
             )
             # Safely extract text without touching response.text accessor
-            text_chunks = []
+            texts = []
+            finish_reason = None
             candidates = getattr(response, 'candidates', None) or []
             for cand in candidates:
+                fr = getattr(cand, 'finish_reason', None)
+                cand_finish_reason = getattr(fr, 'name', fr)
+                finish_reason = finish_reason or cand_finish_reason
+                # A candidate cut off at the token limit is an unfinished letter, not a usable one
+                if cand_finish_reason == 'MAX_TOKENS':
+                    continue
                 content = getattr(cand, 'content', None)
                 parts = getattr(content, 'parts', None) or []
-                for part in parts:
-                    part_text = getattr(part, 'text', None)
-                    if part_text:
-                        text_chunks.append(part_text)
-            if text_chunks:
-                return "".join(text_chunks)
-            # If no parts produced text, attempt a graceful fallback to OpenAI
-            finish_reason = None
-            if candidates:
-                fr = getattr(candidates[0], 'finish_reason', None)
-                finish_reason = getattr(fr, 'name', fr)
-            logger.warning(f"Gemini returned no text (finish_reason={finish_reason}); attempting OpenAI fallback if configured.")
+                cand_text = "".join(getattr(part, 'text', None) or "" for part in parts)
+                if cand_text:
+                    texts.append(cand_text)
+            if texts:
+                return texts
+            # If no candidate produced complete text, attempt a graceful fallback to OpenAI
+            logger.warning(f"Gemini returned no complete text (finish_reason={finish_reason}); attempting OpenAI fallback if configured.")
             fallback_model = 'gpt-4o-mini' if max_tokens <= 200 else 'gpt-4o'
             openai_key = os.getenv('OPENAI_API_KEY')
             if openai_key:
@@ -297,9 +446,10 @@ def _generate_with_model(model_name: str, prompt: str, temperature: float = 0.7,
                         {"role": "user", "content": prompt}
                     ],
                     temperature=temperature,
-                    max_tokens=max_tokens
+                    max_tokens=max_tokens,
+                    n=n
                 )
-                return response.choices[0].message.content
+                return [choice.message.content for choice in response.choices]
             # No OpenAI fallback available
             raise ValueError(f"No text returned from Gemini and no OpenAI fallback configured. finish_reason={finish_reason}")
         else:
@@ -315,16 +465,21 @@ def _generate_with_model(model_name: str, prompt: str, temperature: float = 0.7,
                     {"role": "user", "content": prompt}
                 ],
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                n=n
             )
-            return response.choices[0].message.content
-    except Exception as e:
-        logger.error(f"LLM generation failed for model {model_name}: {str(e)}")
+            return [choice.message.content for choice in response.choices]
+    except CircuitOpenError as e:
+        if allow_fallback and LLM_FALLBACK_MODEL and LLM_FALLBACK_MODEL != model_name:
+            logger.warning(f"{str(e)}; routing to fallback model {LLM_FALLBACK_MODEL}")
+            return _generate_candidates_with_model(LLM_FALLBACK_MODEL, prompt, n=n, temperature=temperature,
+                                                   max_tokens=max_tokens, allow_fallback=False,
+                                                   cap_gemini_output=cap_gemini_output)
         raise
 
 def extract_company_and_job_title(job_description):
     try:
-        logger.info("Extracting company and job title using OpenAI model: gpt-5-mini")
+        stage_logger.info("Extracting company and job title using OpenAI model: gpt-5-mini")
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError('OpenAI API key is not configured')
@@ -386,63 +541,205 @@ def extract_company_and_job_title(job_description):
                 elif line.lower().startswith("job title"):
                     job_title = line.split(":", 1)[-1].strip()
 
-        logger.info(f"Extracted company name: {company_name}")
-        logger.info(f"Extracted job title: {job_title}")
+        stage_logger.info(f"Extracted company name: {company_name}, job title: {job_title}")
 
         return company_name, job_title
-    except Exception as e:
-        logger.error(f"Error extracting company and job title: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Error details: {str(e)}")
-        raise
+    except CircuitOpenError as e:
+        # Not worth failing the whole letter over; the prompt works without these
+        logger.warning(f"Skipping company and job title extraction: {str(e)}")
+        return 'unknown', 'unknown'
+
+def generate_cover_letter_suggestion(resume_text, focus_areas, job_description, first_name, last_name, ai_model, cover_letter_format, candidate_count=1):
+    """Returns (cover_letters, company_name, job_title); cover_letters holds up to candidate_count alternatives."""
+    # Use provided model or default to Gemini 2.5 Pro
+    ai_model = ai_model or 'gemini-2.5-pro'
+    stage_logger.info(f"Starting cover letter generation with AI model: {ai_model}")
+
+    company_name, job_title = extract_company_and_job_title(job_description)
+
+    current_date = date.today().strftime("%B %d, %Y")
+
+    static_prompt = "You are a professional cover letter writer."
+
+    full_prompt = (
+        f"{static_prompt}\n\n"
+        f"Candidate Name: {first_name} {last_name}\n\n"
+        f"Current Date: {current_date}\n\n"
+        f"Company: {company_name}\n"
+        f"Job Title: {job_title}\n\n"
+        f"Job Description: {job_description}\n\n"
+        f"Cover Letter Format: {cover_letter_format}\n\n"
+        f"Focus: {focus_areas}\n\n"
+        f"My Resume:\n{resume_text}\n\n"
+        f"Things to avoid in the writing:\n"
+        "Do not use the phrase 'as advertised'. Do not use the word 'tenure'\n\n"
+        f"Please generate a cover letter that highlights my fit for this role, includes my name, the current date ({current_date}), and matches the format described in Cover Letter Format section."
+    )
+    
+    stage_logger.info("Sending request to LLM provider")
+    # All candidates come back from one request, so the prompt is only paid for once
+    cover_letters = _generate_candidates_with_model(ai_model, full_prompt, n=candidate_count, temperature=0.7, max_tokens=2000)
+    stage_logger.info(f"Received {len(cover_letters)} candidate(s) from LLM provider")
+
+    return cover_letters, company_name, job_title
+
+def split_paragraphs(cover_letter):
+    return [p.strip() for p in re.split(r'\n\s*\n', (cover_letter or '').strip()) if p.strip()]
+
+def rewrite_paragraph(cover_letter, paragraph_index, instructions, company_name, job_title, ai_model):
+    """Rewrite one paragraph with the rest of the letter as context. Returns (new_paragraph, new_cover_letter)."""
+    paragraphs = split_paragraphs(cover_letter)
+    if not 0 <= paragraph_index < len(paragraphs):
+        raise ValueError(f"Paragraph {paragraph_index} does not exist")
+    ai_model = ai_model or 'gemini-2.5-pro'
+    prompt = (
+        "You are a professional cover letter writer.\n\n"
+        f"Company: {company_name}\n"
+        f"Job Title: {job_title}\n\n"
+        f"Full Cover Letter (for context):\n{cover_letter}\n\n"
+        f"Paragraph to rewrite:\n{paragraphs[paragraph_index]}\n\n"
+        f"Instructions: {instructions or 'Make this paragraph stronger and more specific to the role.'}\n\n"
+        "Rewrite only this paragraph so it still flows with the rest of the letter and keeps roughly the same length. "
+        "Do not use the phrase 'as advertised'. Do not use the word 'tenure'. "
+        "Return only the rewritten paragraph, with no quotes or commentary."
+    )
+    new_paragraph = _generate_with_model(ai_model, prompt, temperature=0.7, max_tokens=PARAGRAPH_MAX_TOKENS,
+                                         cap_gemini_output=True).strip()
+    paragraphs[paragraph_index] = new_paragraph
+    return new_paragraph, "\n\n".join(paragraphs)
+
+def revise_cover_letter(prior_cover_letter, job_description, focus_areas, ai_model):
+    """Adapt a letter written for a near-identical posting instead of generating from scratch."""
+    ai_model = ai_model or 'gemini-2.5-pro'
+    current_date = date.today().strftime("%B %d, %Y")
+    prompt = (
+        "You are a professional cover letter writer.\n\n"
+        "Below is a cover letter the candidate already wrote for a nearly identical job posting, followed by the new posting. "
+        "Lightly revise the letter so it fits the new posting: update the date to "
+        f"{current_date}, adjust any details that differ, and keep everything else, including structure and length, unchanged. "
+        "Return only the revised cover letter.\n\n"
+        f"Focus: {focus_areas}\n\n"
+        f"Existing Cover Letter:\n{prior_cover_letter}\n\n"
+        f"New Job Description:\n{job_description}"
+    )
+    return _generate_with_model(ai_model, prompt, temperature=0.3, max_tokens=2000)
+
+MAX_INDEXED_USERS = int(os.getenv('MAX_INDEXED_USERS', '1000'))
+
+class UserIndexCache:
+    """LRU of per-user in-process indexes built from the submission table.
+
+    Each worker keeps its own copy and catches up from the database by id on every
+    lookup, so new submissions from other workers are picked up. Updates and deletes
+    made through other workers are not; callers must tolerate stale entries.
+    """
+
+    def __init__(self, factory, columns, add_row, max_users=MAX_INDEXED_USERS):
+        self.factory = factory
+        self.columns = columns
+        self.add_row = add_row
+        self.max_users = max_users
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = {'index': self.factory(), 'last_id': 0}
+                self._entries[user_id] = entry
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(user_id)
+        response = supabase.table('submission').select(self.columns).eq('user_id', user_id).gt('id', entry['last_id']).order('id').execute()
+        for row in response.data or []:
+            self.add_row(entry['index'], row)
+            entry['last_id'] = max(entry['last_id'], row['id'])
+        return entry['index']
+
+    def add(self, user_id, row):
+        # last_id only moves in get(): rows other workers inserted below this id still need catching up
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None:
+            self.add_row(entry['index'], row)
+
+    def remove(self, user_id, submission_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None:
+            entry['index'].remove(submission_id)
+
+    def drop(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+SIMILAR_JOB_DESCRIPTION_THRESHOLD = float(os.getenv('SIMILAR_JOB_DESCRIPTION_THRESHOLD', '0.8'))
+
+# 'local' swaps the search_submissions() database function for an in-process index (e.g. before migration 0003 is applied)
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'postgres')
+search_indexes = UserIndexCache(
+    SubmissionSearchIndex,
+    'id, company_name, job_title, focus_areas, cover_letter, created_at',
+    lambda index, row: index.add(row['id'], row),
+)
+_user_index_caches = (search_indexes,)
 
-def generate_cover_letter_suggestion(resume_text, focus_areas, job_description, first_name, last_name, ai_model, cover_letter_format):
-    try:
-        logger.info("Starting cover letter generation process")
-        # Use provided model or default to Gemini 2.5 Pro
-        ai_model = ai_model or 'gemini-2.5-pro'
+def job_description_bands(job_description, resume_text):
+    return lsh_band_hashes(job_description or '', group=text_fingerprint(resume_text))
 
-        logger.info(f"Using AI model: {ai_model}")
-        
-        logger.info("Extracting company and job title")
-        company_name, job_title = extract_company_and_job_title(job_description)
-        logger.info(f"Extracted - Company: {company_name}, Job Title: {job_title}")
-
-        current_date = date.today().strftime("%B %d, %Y")
-        logger.info(f"Using current date: {current_date}")
-
-        static_prompt = "You are a professional cover letter writer."
-
-        full_prompt = (
-            f"{static_prompt}\n\n"
-            f"Candidate Name: {first_name} {last_name}\n\n"
-            f"Current Date: {current_date}\n\n"
-            f"Company: {company_name}\n"
-            f"Job Title: {job_title}\n\n"
-            f"Job Description: {job_description}\n\n"
-            f"Cover Letter Format: {cover_letter_format}\n\n"
-            f"Focus: {focus_areas}\n\n"
-            f"My Resume:\n{resume_text}\n\n"
-            f"Things to avoid in the writing:\n"
-            "Do not use the phrase 'as advertised'. Do not use the word 'tenure'\n\n"
-            f"Please generate a cover letter that highlights my fit for this role, includes my name, the current date ({current_date}), and matches the format described in Cover Letter Format section."
-        )
-        
-        logger.info("Sending request to LLM provider")
-        try:
-            cover_letter = _generate_with_model(ai_model, full_prompt, temperature=0.7, max_tokens=2000)
-            logger.info("Successfully received response from LLM provider")
-        except Exception as e:
-            logger.error(f"LLM request failed: {str(e)}")
-            raise
-        logger.info("Successfully generated cover letter")
-        
-        return cover_letter, company_name, job_title
+def find_similar_submission(user_id, job_description, bands):
+    """Return (submission_id, similarity) of the closest prior submission with the same resume, or None."""
+    try:
+        # Candidates share at least one LSH band (bands are salted with the resume); confirm with exact Jaccard.
+        # Bands go over as strings: some postgrest versions join array values with str.join
+        response = supabase.table('submission').select('id, job_description').eq('user_id', user_id).overlaps('job_description_bands', [str(band) for band in bands]).limit(50).execute()
+        candidates = [(row['id'], row.get('job_description') or '') for row in response.data or []]
+        matches = rank_near_duplicates(job_description or '', candidates, SIMILAR_JOB_DESCRIPTION_THRESHOLD)
+        return matches[0] if matches else None
     except Exception as e:
-        logger.error(f"Error generating cover letter: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Error details: {str(e)}")
-        raise
+        logger.error(f"Error checking for similar submissions: {str(e)}")
+        return None
+
+def search_submission_history(user_id, query, limit=20, offset=0):
+    """Return (hits, has_more) ranked by relevance; each hit carries id, company_name, job_title, created_at, rank, snippet."""
+    if SEARCH_BACKEND != 'local':
+        response = supabase.rpc('search_submissions', {
+            'p_user_id': user_id,
+            'p_query': query,
+            'p_limit': limit + 1,
+            'p_offset': offset,
+        }).execute()
+        rows = response.data or []
+        return rows[:limit], len(rows) > limit
+    index = search_indexes.get(user_id)
+    hits, has_more = index.search(query, limit=limit, offset=offset)
+    if hits:
+        # The local index never sees deletes made through other workers; drop those hits here
+        response = supabase.table('submission').select('id').eq('user_id', user_id).in_('id', [hit['id'] for hit in hits]).execute()
+        existing_ids = {row['id'] for row in response.data or []}
+        for hit in hits:
+            if hit['id'] not in existing_ids:
+                index.remove(hit['id'])
+        hits = [hit for hit in hits if hit['id'] in existing_ids]
+    return hits, has_more
+
+def index_submission(user_id, submission_data):
+    for cache in _user_index_caches:
+        cache.add(user_id, submission_data)
+
+def unindex_submission(user_id, submission_id):
+    for cache in _user_index_caches:
+        cache.remove(user_id, submission_id)
+
+# Identical submits (double-clicks, browser retries) attach to the generation already running in this worker
+submit_flights = SingleFlight()
+
+def submission_id_for_idempotency_key(user_id, idempotency_key):
+    response = supabase.table('submission').select('id').eq('user_id', user_id).eq('idempotency_key', idempotency_key).execute()
+    return response.data[0]['id'] if response.data else None
 
 def handle_db_error(e):
     logger.error(f"Database error: {str(e)}")
@@ -451,6 +748,63 @@ def handle_db_error(e):
     db.session.rollback()
     flash("An error occurred while accessing the database. Please try again later.", "error")
 
+REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+@app.before_request
+def assign_request_id():
+    # Reuse the id from an upstream proxy when it looks sane, so log lines can be joined across hops
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming if REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+
+@app.after_request
+def add_request_id_header(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+# Fingerprinted, precompressed assets produced by build_static.py
+TAILWIND_CDN_URL = 'https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css'
+STATIC_DIST_DIR = os.path.join(app.root_path, 'static', 'dist')
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+_asset_manifest = None
+
+def _load_asset_manifest():
+    global _asset_manifest
+    if _asset_manifest is None:
+        try:
+            with open(os.path.join(STATIC_DIST_DIR, 'manifest.json')) as f:
+                _asset_manifest = json.load(f)
+        except FileNotFoundError:
+            logger.warning("static/dist/manifest.json not found; run build_static.py. Falling back to CDN assets.")
+            _asset_manifest = {}
+    return _asset_manifest
+
+def asset_url(name, default=None):
+    hashed_name = _load_asset_manifest().get(name)
+    return url_for('asset', filename=hashed_name) if hashed_name else default
+
+@app.context_processor
+def inject_asset_helpers():
+    return {'asset_url': asset_url, 'TAILWIND_CDN_URL': TAILWIND_CDN_URL}
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    path = safe_join(STATIC_DIST_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(path + suffix):
+            response = send_file(path + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_file(path, mimetype=mimetype)
+    # File names change with their content, so they can be cached forever
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -531,17 +885,18 @@ def dashboard():
 @app.route('/submit', methods=['GET', 'POST'])
 @login_required
 def submit():
-    logger.info("Entering submit function")
-
     if request.method == 'POST':
-        logger.info("Processing POST request for submission")
+        stage_logger.info("Processing POST request for submission")
         resume_selection = request.form.get('resume_selection')
+        idempotency_key = (request.form.get('idempotency_key') or '')[:64] or None
 
         try:
             if resume_selection and resume_selection != 'new':
                 resume = Resume.get_by_id(resume_selection)
                 if resume and resume.user_id == current_user.id:
+                    resume_id = resume.id
                     resume_text = resume.content
+                    resume_prompt_text = resume.prompt_text()
                     filename = resume.filename
                 else:
                     flash('Invalid resume selection')
@@ -562,22 +917,31 @@ def submit():
                     filename = secure_filename(file.filename)
                     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
                     file.save(filepath)
-                    logger.info(f"File saved: {filepath}")
+                    stage_logger.info(f"File saved: {filepath}")
 
                     resume_text = extract_text_from_pdf(filepath)
-
-                    new_resume_data = {
-                        'filename': filename,
-                        'content': resume_text,
-                        'user_id': current_user.id,
-                        'created_at': datetime.utcnow().isoformat()
-                    }
-                    response = supabase.table('resume').insert(new_resume_data).execute()
-                    if not response.data:
-                        raise Exception("Failed to save resume")
+                    # Digest once here so every later generation sends the compact version
+                    resume_digest = build_resume_digest(resume_text)
+                    resume_prompt_text = format_resume_digest(resume_digest) or resume_text
+
+                    # A retried upload of the same file reuses the resume saved the first time
+                    response = supabase.table('resume').select('id, content').eq('user_id', current_user.id).eq('filename', filename).execute()
+                    resume_id = next((r['id'] for r in response.data or [] if r['content'] == resume_text), None)
+                    if resume_id is None:
+                        new_resume_data = {
+                            'filename': filename,
+                            'content': resume_text,
+                            'digest': resume_digest,
+                            'user_id': current_user.id,
+                            'created_at': datetime.utcnow().isoformat()
+                        }
+                        response = supabase.table('resume').insert(new_resume_data).execute()
+                        if not response.data:
+                            raise Exception("Failed to save resume")
+                        resume_id = response.data[0]['id']
 
                     os.remove(filepath)
-                    logger.info(f"Temporary file removed: {filepath}")
+                    stage_logger.info(f"Temporary file removed: {filepath}")
                 else:
                     logger.warning("Invalid file type")
                     flash('Invalid file type. Please upload a PDF file.')
@@ -585,57 +949,184 @@ def submit():
 
             focus_areas = request.form.get('focus_areas')
             job_description = request.form.get('job_description')
+            revise_submission_id = request.form.get('revise_submission_id', type=int)
+            candidate_count = min(max(request.form.get('candidate_count', 1, type=int), 1), MAX_CANDIDATES)
+            bands = job_description_bands(job_description, resume_text)
+
+            # The form's key only identifies a retry of the same payload. A page restored with
+            # Back and edited before resubmitting keeps its key but must not get the old letter.
+            payload_key = (text_fingerprint(resume_text), text_fingerprint(job_description),
+                           text_fingerprint(focus_areas), candidate_count, revise_submission_id)
+            stored_idempotency_key = None
+            if idempotency_key:
+                stored_idempotency_key = f"{idempotency_key}:{text_fingerprint(repr(payload_key))}"
+                existing_submission_id = submission_id_for_idempotency_key(current_user.id, stored_idempotency_key)
+                if existing_submission_id:
+                    logger.info(f"Repeated submit for idempotency key; returning submission {existing_submission_id}")
+                    return redirect(url_for('result', submission_id=existing_submission_id))
+
+            # Offer to reuse a letter already written for a near-identical posting with the same resume
+            if revise_submission_id is None and not request.form.get('skip_similar_check'):
+                match = find_similar_submission(current_user.id, job_description, bands)
+                if match:
+                    similar_submission = Submission.get_by_id(match[0])
+                    if similar_submission and similar_submission.user_id == current_user.id:
+                        logger.info(f"Found similar submission {similar_submission.id} (similarity {match[1]:.2f})")
+                        return render_template('similar_submission.html', similar_submission=similar_submission,
+                                               similarity=match[1], resume_id=resume_id, candidate_count=candidate_count,
+                                               focus_areas=focus_areas, job_description=job_description,
+                                               idempotency_key=idempotency_key)
+
+            def generate_and_save():
+                with _track_inflight_generation():
+                    prior_submission = Submission.get_by_id(revise_submission_id) if revise_submission_id else None
+                    if prior_submission and prior_submission.user_id == current_user.id:
+                        stage_logger.info(f"Revising cover letter from submission {prior_submission.id}")
+                        cover_letters = [revise_cover_letter(prior_submission.cover_letter, job_description,
+                                                             focus_areas, current_user.ai_model)]
+                        company_name, job_title = prior_submission.company_name, prior_submission.job_title
+                    else:
+                        stage_logger.info("Generating cover letter suggestion")
+                        cover_letters, company_name, job_title = generate_cover_letter_suggestion(
+                            resume_prompt_text, focus_areas, job_description, current_user.first_name,
+                            current_user.last_name, current_user.ai_model,
+                            current_user.cover_letter_format, candidate_count=candidate_count)
+
+                    new_submission_data = {
+                        'resume_text': resume_text,
+                        'focus_areas': focus_areas,
+                        'job_description': job_description,
+                        'job_description_bands': bands,
+                        'cover_letter': cover_letters[0],
+                        'cover_letter_candidates': cover_letters if len(cover_letters) > 1 else None,
+                        'company_name': company_name,
+                        'job_title': job_title,
+                        'user_id': current_user.id,
+                        'idempotency_key': stored_idempotency_key,
+                        'created_at': datetime.utcnow().isoformat()
+                    }
+                    try:
+                        response = supabase.table('submission').insert(new_submission_data).execute()
+                    except Exception:
+                        # Another worker already saved this form (unique user_id + idempotency_key)
+                        existing_submission_id = stored_idempotency_key and submission_id_for_idempotency_key(current_user.id, stored_idempotency_key)
+                        if existing_submission_id:
+                            return existing_submission_id
+                        raise
+                    if not response.data:
+                        raise Exception("Failed to save submission")
 
-            logger.info("Generating cover letter suggestion")
-            cover_letter, company_name, job_title = generate_cover_letter_suggestion(
-                resume_text, focus_areas, job_description, current_user.first_name,
-                current_user.last_name, current_user.ai_model,
-                current_user.cover_letter_format)
-
-            logger.info(f"Extracted company name: {company_name}")
-            logger.info(f"Extracted job title: {job_title}")
-
-            new_submission_data = {
-                'resume_text': resume_text,
-                'focus_areas': focus_areas,
-                'job_description': job_description,
-                'cover_letter': cover_letter,
-                'company_name': company_name,
-                'job_title': job_title,
-                'user_id': current_user.id,
-                'created_at': datetime.utcnow().isoformat()
-            }
-            response = supabase.table('submission').insert(new_submission_data).execute()
-            if not response.data:
-                raise Exception("Failed to save submission")
-            
-            submission_id = response.data[0]['id']
-            logger.info(f"New submission created: {submission_id}")
+                submission_id = response.data[0]['id']
+                logger.info(f"New submission created: {submission_id}")
+                index_submission(current_user.id, {**new_submission_data, 'id': submission_id})
+                return submission_id
+
+            flight_key = (current_user.id,) + payload_key
+            submission_id, shared = submit_flights.do(flight_key, generate_and_save)
+            if shared:
+                logger.info(f"Duplicate submit attached to in-flight generation of submission {submission_id}")
 
             return redirect(url_for('result', submission_id=submission_id))
         except Exception as e:
-            logger.error(f"Error during submission: {str(e)}")
+            logger.exception(f"Error during submission: {str(e)}", extra={'error_type': type(e).__name__})
             flash('An error occurred during submission')
             return redirect(request.url)
 
-    response = supabase.table('resume').select('*').eq('user_id', current_user.id).order('created_at', desc=True).execute()
+    response = supabase.table('resume').select(Resume.LIST_COLUMNS).eq('user_id', current_user.id).order('created_at', desc=True).execute()
     saved_resumes = [Resume(resume_data) for resume_data in response.data] if response.data else []
-    return render_template('submit.html', saved_resumes=saved_resumes)
+    return render_template('submit.html', saved_resumes=saved_resumes, max_candidates=MAX_CANDIDATES,
+                           idempotency_key=secrets.token_urlsafe(16))
 
 @app.route('/result/<int:submission_id>')
 @login_required
 def result(submission_id):
     submission = Submission.get_by_id(submission_id)
+    if not submission:
+        # Possibly deleted by a request another worker served; keep it out of this worker's search index
+        unindex_submission(current_user.id, submission_id)
+        flash('This submission no longer exists.')
+        return redirect(url_for('view_submissions'))
     if submission.user_id != current_user.id:
         flash('You do not have permission to view this submission.')
         return redirect(url_for('dashboard'))
-    return render_template('result.html', submission=submission)
+    try:
+        response = supabase.table('submission_revision').select('id, paragraph_index, instructions, created_at').eq('submission_id', submission_id).order('created_at', desc=True).execute()
+        revisions = response.data or []
+    except Exception as e:
+        logger.error(f"Error loading revisions: {str(e)}")
+        revisions = []
+    return render_template('result.html', submission=submission, paragraphs=split_paragraphs(submission.cover_letter), revisions=revisions)
+
+def save_cover_letter_revision(submission, new_cover_letter, paragraph_index=None, instructions=None):
+    """Record the change in submission_revision, then replace the letter. Returns the updated submission row."""
+    response = supabase.table('submission_revision').insert({
+        'submission_id': submission.id,
+        'user_id': submission.user_id,
+        'paragraph_index': paragraph_index,
+        'instructions': instructions,
+        'previous_cover_letter': submission.cover_letter,
+        'cover_letter': new_cover_letter,
+        'created_at': datetime.utcnow().isoformat()
+    }).execute()
+    if not response.data:
+        raise Exception("Failed to save revision")
+    revision_id = response.data[0]['id']
+    try:
+        response = supabase.table('submission').update({'cover_letter': new_cover_letter}).eq('id', submission.id).execute()
+        if not response.data:
+            raise Exception("Failed to update submission")
+    except Exception:
+        supabase.table('submission_revision').delete().eq('id', revision_id).execute()
+        raise
+    return response.data[0]
+
+@app.route('/regenerate_paragraph/<int:submission_id>', methods=['POST'])
+@login_required
+def regenerate_paragraph(submission_id):
+    submission = Submission.get_by_id(submission_id)
+    if not submission or submission.user_id != current_user.id:
+        return jsonify({'success': False, 'message': 'You do not have permission to edit this submission.'}), 403
+    data = request.get_json(silent=True) or {}
+    paragraph_index = data.get('paragraph_index')
+    instructions = (data.get('instructions') or '').strip()
+    if not isinstance(paragraph_index, int) or not 0 <= paragraph_index < len(split_paragraphs(submission.cover_letter)):
+        return jsonify({'success': False, 'message': 'Invalid paragraph.'}), 400
+    try:
+        with _track_inflight_generation():
+            new_paragraph, new_cover_letter = rewrite_paragraph(
+                submission.cover_letter, paragraph_index, instructions,
+                submission.company_name, submission.job_title, current_user.ai_model)
+            updated = save_cover_letter_revision(submission, new_cover_letter, paragraph_index, instructions or None)
+        index_submission(current_user.id, updated)
+        return jsonify({'success': True, 'paragraph': new_paragraph, 'cover_letter': new_cover_letter})
+    except Exception as e:
+        logger.exception(f"Error regenerating paragraph: {str(e)}", extra={'error_type': type(e).__name__})
+        return jsonify({'success': False, 'message': 'An error occurred while rewriting the paragraph.'}), 500
+
+@app.route('/select_candidate/<int:submission_id>', methods=['POST'])
+@login_required
+def select_candidate(submission_id):
+    submission = Submission.get_by_id(submission_id)
+    if not submission or submission.user_id != current_user.id:
+        return jsonify({'success': False, 'message': 'You do not have permission to edit this submission.'}), 403
+    data = request.get_json(silent=True) or {}
+    index = data.get('index')
+    if not isinstance(index, int) or not 0 <= index < len(submission.cover_letter_candidates):
+        return jsonify({'success': False, 'message': 'Invalid candidate.'}), 400
+    try:
+        # Recorded as a revision so a letter edited paragraph by paragraph can be recovered
+        updated = save_cover_letter_revision(submission, submission.cover_letter_candidates[index])
+        index_submission(current_user.id, updated)
+        return jsonify({'success': True})
+    except Exception as e:
+        logger.error(f"Error selecting candidate: {str(e)}")
+        return jsonify({'success': False, 'message': 'An error occurred while updating the submission.'}), 500
 
 @app.route('/view_submissions')
 @login_required
 def view_submissions():
     try:
-        response = supabase.table('submission').select('*').eq('user_id', current_user.id).order('created_at', desc=True).execute()
+        response = supabase.table('submission').select(Submission.LIST_COLUMNS).eq('user_id', current_user.id).order('created_at', desc=True).execute()
         submissions = [Submission(submission_data) for submission_data in response.data] if response.data else []
         return render_template('view_submissions.html', submissions=submissions)
     except Exception as e:
@@ -643,6 +1134,33 @@ def view_submissions():
         flash('An error occurred while loading submissions')
         return redirect(url_for('dashboard'))
 
+@app.route('/search_submissions')
+@login_required
+def search_submissions():
+    query = (request.args.get('q') or '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 50)
+    if not query:
+        return jsonify({'success': False, 'message': 'Enter something to search for.'}), 400
+    try:
+        hits, has_more = search_submission_history(current_user.id, query, limit=per_page, offset=(page - 1) * per_page)
+        results = []
+        for hit in hits:
+            snippet_html = str(escape(hit.get('snippet') or '')).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+            results.append({
+                'id': hit['id'],
+                'company_name': hit.get('company_name'),
+                'job_title': hit.get('job_title'),
+                'created_at': hit.get('created_at'),
+                'rank': hit.get('rank'),
+                'snippet_html': snippet_html,
+                'url': url_for('result', submission_id=hit['id']),
+            })
+        return jsonify({'success': True, 'results': results, 'page': page, 'has_more': has_more})
+    except Exception as e:
+        logger.exception(f"Error searching submissions: {str(e)}", extra={'error_type': type(e).__name__})
+        return jsonify({'success': False, 'message': 'An error occurred while searching submissions.'}), 500
+
 @app.route('/delete_submission/<int:submission_id>', methods=['POST'])
 @login_required
 def delete_submission(submission_id):
@@ -653,6 +1171,7 @@ def delete_submission(submission_id):
 
         response = supabase.table('submission').delete().eq('id', submission_id).execute()
         if response.data:
+            unindex_submission(current_user.id, submission_id)
             return jsonify({'success': True})
         return jsonify({'success': False, 'message': 'Failed to delete submission.'}), 500
     except Exception as e:
@@ -751,6 +1270,8 @@ def settings():
 @login_required
 def delete_account():
     current_user.delete_account()
+    for cache in _user_index_caches:
+        cache.drop(current_user.id)
     logout_user()
     flash('Your account has been deleted', 'success')
     return redirect(url_for('index'))
@@ -816,5 +1337,21 @@ def reset_password(token):
 
     return render_template('reset_password.html', token=token)
 
+@app.route('/internal/health')
+def internal_health():
+    # Disabled unless HEALTH_CHECK_TOKEN is set; callers send it as X-Health-Token
+    health_token = os.getenv('HEALTH_CHECK_TOKEN')
+    if not health_token:
+        abort(404)
+    if not secrets.compare_digest(request.headers.get('X-Health-Token', ''), health_token):
+        return jsonify({'success': False, 'message': 'Forbidden'}), 403
+    breakers = circuit_breakers.snapshot()
+    degraded = any(b['state'] != 'closed' for b in breakers.values())
+    return jsonify({
+        'status': 'degraded' if degraded else 'ok',
+        'inflight_generations': _inflight_generations,
+        'circuit_breakers': breakers,
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+-- Tables as used by main.py. IF NOT EXISTS so this is a no-op on the existing database.
+CREATE TABLE IF NOT EXISTS "user" (
+    id serial PRIMARY KEY,
+    username text NOT NULL,
+    email text,
+    first_name text,
+    last_name text,
+    password_hash text,
+    ai_model text DEFAULT 'gemini-2.5-pro',
+    reset_token text,
+    reset_token_expiration timestamp,
+    cover_letter_format text
+);
+
+CREATE TABLE IF NOT EXISTS resume (
+    id serial PRIMARY KEY,
+    filename text,
+    content text,
+    user_id integer NOT NULL REFERENCES "user" (id),
+    created_at timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE TABLE IF NOT EXISTS submission (
+    id serial PRIMARY KEY,
+    resume_text text,
+    focus_areas text,
+    job_description text,
+    cover_letter text,
+    company_name text,
+    job_title text,
+    user_id integer NOT NULL REFERENCES "user" (id),
+    created_at timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
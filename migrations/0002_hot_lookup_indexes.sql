@@ -0,0 +1,9 @@
+-- login / register
+CREATE UNIQUE INDEX IF NOT EXISTS user_username_key ON "user" (username);
+-- forgot_password
+CREATE INDEX IF NOT EXISTS user_email_idx ON "user" (email);
+-- reset_password
+CREATE UNIQUE INDEX IF NOT EXISTS user_reset_token_key ON "user" (reset_token) WHERE reset_token IS NOT NULL;
+-- submit / view_submissions listings, newest first
+CREATE INDEX IF NOT EXISTS resume_user_id_created_at_idx ON resume (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS submission_user_id_created_at_idx ON submission (user_id, created_at DESC);
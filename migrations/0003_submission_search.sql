@@ -0,0 +1,35 @@
+-- Full-text search over submission history (see /search_submissions)
+CREATE EXTENSION IF NOT EXISTS btree_gin SCHEMA public;
+
+ALTER TABLE submission ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(company_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(job_title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(focus_areas, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(cover_letter, '')), 'C')
+    ) STORED;
+
+-- btree_gin lets one GIN index serve both the user filter and the text match
+CREATE INDEX IF NOT EXISTS submission_user_id_search_vector_idx ON submission USING GIN (user_id, search_vector);
+
+-- Ranked page of hits for one user. Snippets are only built for the returned page,
+-- and only the listed columns leave the database.
+CREATE OR REPLACE FUNCTION search_submissions(p_user_id integer, p_query text, p_limit integer DEFAULT 20, p_offset integer DEFAULT 0)
+RETURNS TABLE (id integer, company_name text, job_title text, created_at timestamp, rank real, snippet text)
+LANGUAGE sql STABLE AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', p_query) AS q
+    ), hits AS (
+        SELECT s.id, s.company_name, s.job_title, s.created_at, s.focus_areas, s.cover_letter,
+               ts_rank_cd(s.search_vector, query.q) AS rank
+        FROM submission s, query
+        WHERE s.user_id = p_user_id AND s.search_vector @@ query.q
+        ORDER BY rank DESC, s.created_at DESC
+        LIMIT p_limit OFFSET p_offset
+    )
+    SELECT hits.id, hits.company_name, hits.job_title, hits.created_at, hits.rank,
+           ts_headline('english', coalesce(hits.focus_areas, '') || ' ' || coalesce(hits.cover_letter, ''), query.q,
+                       'MaxFragments=2, MaxWords=20, MinWords=8, StartSel=⟦, StopSel=⟧')
+    FROM hits, query
+    ORDER BY hits.rank DESC, hits.created_at DESC
+$$;
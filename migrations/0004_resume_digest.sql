@@ -0,0 +1,2 @@
+-- Structured resume digest built once at upload (utils/resume_digest.py) and used in prompts instead of raw PDF text
+ALTER TABLE resume ADD COLUMN IF NOT EXISTS digest jsonb;
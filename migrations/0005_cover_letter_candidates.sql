@@ -0,0 +1,2 @@
+-- Alternative letters returned by a multi-candidate generation; cover_letter holds the selected one
+ALTER TABLE submission ADD COLUMN IF NOT EXISTS cover_letter_candidates jsonb;
@@ -0,0 +1,13 @@
+-- History of edits made to a submission's letter after generation (e.g. single-paragraph rewrites)
+CREATE TABLE IF NOT EXISTS submission_revision (
+    id serial PRIMARY KEY,
+    submission_id integer NOT NULL REFERENCES submission (id) ON DELETE CASCADE,
+    user_id integer NOT NULL REFERENCES "user" (id) ON DELETE CASCADE,
+    paragraph_index integer,
+    instructions text,
+    previous_cover_letter text,
+    cover_letter text NOT NULL,
+    created_at timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS submission_revision_submission_id_created_at_idx ON submission_revision (submission_id, created_at DESC);
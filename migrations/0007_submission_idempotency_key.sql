@@ -0,0 +1,4 @@
+-- Per-form key sent with /submit so a retried POST returns the submission it already created
+ALTER TABLE submission ADD COLUMN IF NOT EXISTS idempotency_key text;
+
+CREATE UNIQUE INDEX IF NOT EXISTS submission_user_id_idempotency_key_key ON submission (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
@@ -0,0 +1,6 @@
+-- MinHash LSH band keys of the job description, salted with the resume (utils/similarity.py lsh_band_hashes).
+-- Near-duplicate lookups on /submit are an overlap query on this array. Rows created
+-- before this migration are filled in by `python db_migrate.py backfill-bands`.
+ALTER TABLE submission ADD COLUMN IF NOT EXISTS job_description_bands bigint[];
+
+CREATE INDEX IF NOT EXISTS submission_job_description_bands_idx ON submission USING GIN (job_description_bands);
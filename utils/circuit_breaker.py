@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Count-based circuit breaker.
+
+    Opens when the error rate over the last `window` calls reaches `error_rate` (once at
+    least `min_calls` have been seen), rejects calls for `open_seconds`, then lets up to
+    `half_open_trials` probe calls through. A successful probe closes the circuit; a
+    failed one opens it again.
+    """
+
+    def __init__(self, name, error_rate=0.5, min_calls=5, window=20, open_seconds=30.0, half_open_trials=1,
+                 is_failure=None, clock=time.monotonic):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_trials = half_open_trials
+        self.is_failure = is_failure or (lambda e: True)
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = None
+        self._trials_in_flight = 0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials_in_flight = 0
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        self._trials_in_flight = 0
+
+    def allow(self):
+        """Reserve permission for one call. Raises CircuitOpenError when the call must fail fast."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._trials_in_flight < self.half_open_trials:
+                self._trials_in_flight += 1
+                return
+            self._rejected += 1
+            retry_after = max(self.open_seconds - (self._clock() - self._opened_at), 0) if self._opened_at is not None else 0
+            raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._open()
+
+    def release(self):
+        """Give back a reserved half-open probe whose call ended without an outcome (e.g. a gevent.Timeout)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials_in_flight:
+                self._trials_in_flight -= 1
+
+    def call(self, fn, *args, **kwargs):
+        self.allow()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Says nothing about the provider, but the probe slot must not leak
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._outcomes)
+            return {
+                'state': self._state,
+                'recent_calls': calls,
+                'recent_error_rate': round(self._outcomes.count(False) / calls, 3) if calls else 0.0,
+                'times_opened': self._times_opened,
+                'rejected_calls': self._rejected,
+                'retry_after': round(max(self.open_seconds - (self._clock() - self._opened_at), 0), 1) if self._state == OPEN else 0,
+            }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per name (e.g. 'openai:gpt-4o'), created on first use with shared settings."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, **self.settings)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+_MISSING = object()
+
+
+def parse_datetime(value):
+    """ISO string (as returned by Supabase) to datetime; None means the row has no timestamp yet."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value) if value else datetime.utcnow()
+
+
+class Column:
+    """A model attribute backed by one key of the raw row dict.
+
+    Nothing is copied at construction. `parse` runs on first access and its result
+    replaces the raw value in the row, so it runs once per instance. A `deferred` column
+    that was left out of the select is fetched, together with the model's other missing
+    deferred columns, the first time any of them is read.
+    """
+
+    def __init__(self, default=None, parse=None, deferred=False):
+        self.default = default
+        self.parse = parse
+        self.deferred = deferred
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        row = instance._row
+        value = row.get(self.name, _MISSING)
+        if value is _MISSING:
+            if self.deferred and row.get('id') is not None:
+                instance._hydrate_deferred()
+                value = row.get(self.name, self.default)
+            else:
+                value = self.default
+        if self.parse is not None:
+            value = self.parse(value)
+            row[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance._row[self.name] = value
+
+
+class LazyModel:
+    """Base for row-backed models: one slot holding the row dict Supabase returned."""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row):
+        self._row = row
+
+    @classmethod
+    def deferred_columns(cls):
+        return [name for klass in reversed(cls.__mro__) for name, attr in vars(klass).items()
+                if isinstance(attr, Column) and attr.deferred]
+
+    def _hydrate_deferred(self):
+        missing = [name for name in self.deferred_columns() if name not in self._row]
+        if missing:
+            fetched = self.fetch_columns(self._row['id'], missing) or {}
+            for name in missing:
+                self._row[name] = fetched.get(name)
+
+    def fetch_columns(self, row_id, columns):
+        """Return {column: value} for the given columns of this row. Subclasses load it from storage."""
+        raise NotImplementedError
@@ -1,9 +1,7 @@
 import PyPDF2
 
 def extract_text_from_pdf(file_path):
-    text = ""
+    """Text of every page, with pages separated by a form feed (\\f)."""
     with open(file_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text()
-    return text 
+        return '\f'.join(page.extract_text() or '' for page in reader.pages)
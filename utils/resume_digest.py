@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+
+# Bump when the digest format changes so stored digests are rebuilt on next use
+RESUME_DIGEST_VERSION = 2
+
+SECTION_ORDER = ['header', 'summary', 'experience', 'projects', 'skills', 'education', 'certifications', 'awards', 'publications', 'other']
+SECTION_ALIASES = {
+    'summary': ('summary', 'profile', 'objective', 'about', 'about me', 'professional summary', 'career summary'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'relevant experience', 'career history'),
+    'projects': ('projects', 'personal projects', 'selected projects', 'key projects'),
+    'skills': ('skills', 'technical skills', 'core competencies', 'competencies', 'technologies', 'tools', 'skills & tools',
+               'skills and tools', 'languages and tools'),
+    'education': ('education', 'academic background', 'education and training'),
+    'certifications': ('certifications', 'certificates', 'licenses', 'licenses and certifications', 'licenses & certifications'),
+    'awards': ('awards', 'honors', 'honors and awards', 'honors & awards', 'achievements'),
+    'publications': ('publications', 'papers', 'research'),
+    'other': ('interests', 'volunteer', 'volunteering', 'volunteer experience', 'activities', 'leadership'),
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+LIGATURES = {'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬃ': 'ffi', 'ﬄ': 'ffl', '\u00a0': ' ', '\u2009': ' '}
+BULLET_RE = re.compile(r'^\s*[•▪●◦‣⁃■□➢∙*\-–—]+\s*')
+# 'Page 2', 'Page 2 of 3', '2 of 3', '2/3'. A bare number is only a page number at the top or bottom of a page.
+PAGE_LABEL_RE = re.compile(r'^\s*(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+)\s*$', re.IGNORECASE)
+BARE_NUMBER_RE = re.compile(r'^\s*(\d{1,3})\s*$')
+HYPHEN_BREAK_RE = re.compile(r'([A-Za-z]+)-\n([a-z]+)')
+RANGE_BREAK_RE = re.compile(r'(\d)[ \t]*([-–])\n[ \t]*(\d)')
+WORD_RE = re.compile(r'[A-Za-z]+(?:-[A-Za-z]+)*')
+SPACES_RE = re.compile(r'[ \t]+')
+
+
+def normalize_resume_text(text):
+    """Undo the usual PDF extraction noise: ligatures, hyphenated line breaks, stray bullets, page numbers and repeated headers.
+
+    Pages are expected to be separated by form feeds, as extract_text_from_pdf() does.
+    """
+    if not text:
+        return []
+    for src, dst in LIGATURES.items():
+        text = text.replace(src, dst)
+    text = _rejoin_hyphenated(text)
+    pages = text.split('\f')
+    lines = []
+    for page in pages:
+        page_lines = [SPACES_RE.sub(' ', raw_line).strip() for raw_line in page.splitlines()]
+        page_lines = [line for line in page_lines if line]
+        for i, line in enumerate(page_lines):
+            if PAGE_LABEL_RE.match(line) or (i in (0, len(page_lines) - 1) and _is_page_number(line, len(pages))):
+                continue
+            if BULLET_RE.match(line):
+                line = '- ' + BULLET_RE.sub('', line)
+            lines.append(line)
+    # Page headers (name, contact line) repeat at the top of every page
+    counts = Counter(lines)
+    page_header = {line for line in lines[:3] if counts[line] > 1}
+    seen = set()
+    deduped = []
+    for line in lines:
+        if line in page_header:
+            if line in seen:
+                continue
+            seen.add(line)
+        deduped.append(line)
+    return deduped
+
+
+def _is_page_number(line, page_count):
+    match = BARE_NUMBER_RE.match(line)
+    return bool(match) and 1 <= int(match.group(1)) <= page_count
+
+
+def _rejoin_hyphenated(text):
+    """Join words split across lines ('develop-\\nment'). The hyphen is dropped only if the
+    joined word appears elsewhere in the text, so compounds like 'full-stack' keep it.
+    Number ranges ('2019-\\n2021') are put back on one line with their dash."""
+    text = RANGE_BREAK_RE.sub(r'\1\2\3', text)
+    words = {w.lower() for w in WORD_RE.findall(text)}
+
+    def join(match):
+        left, right = match.group(1), match.group(2)
+        return left + right if (left + right).lower() in words else f'{left}-{right}'
+
+    return HYPHEN_BREAK_RE.sub(join, text)
+
+
+def _heading_section(line):
+    if len(line) > 40 or line.startswith('- '):
+        return None
+    key = line.rstrip(':').strip().lower()
+    return _HEADING_LOOKUP.get(key)
+
+
+def _join_wrapped_lines(lines):
+    """Re-join lines that PDF extraction wrapped mid-sentence."""
+    joined = []
+    for line in lines:
+        if joined and not line.startswith('- ') and joined[-1] and joined[-1][-1] not in '.:;!?' and line[:1].islower():
+            joined[-1] = f'{joined[-1]} {line}'
+        else:
+            joined.append(line)
+    return joined
+
+
+def build_resume_digest(text):
+    """Split resume text into canonical sections. Returns a JSON-serialisable dict."""
+    sections = {}
+    current = 'header'
+    for line in normalize_resume_text(text):
+        section = _heading_section(line)
+        if section:
+            current = section
+            continue
+        sections.setdefault(current, []).append(line)
+    return {
+        'version': RESUME_DIGEST_VERSION,
+        'sections': {
+            name: '\n'.join(lines if name == 'header' else _join_wrapped_lines(lines))
+            for name, lines in sections.items() if lines
+        },
+    }
+
+
+def format_resume_digest(digest):
+    """Render a digest as compact prompt text with one labelled block per section."""
+    sections = (digest or {}).get('sections') or {}
+    blocks = []
+    for name in SECTION_ORDER:
+        body = sections.get(name)
+        if body:
+            label = 'Contact' if name == 'header' else name.capitalize()
+            blocks.append(f'{label}:\n{body}')
+    return '\n\n'.join(blocks)
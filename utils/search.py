@@ -0,0 +1,132 @@
+import math
+import re
+import threading
+
+# Same markers the search_submissions() SQL function passes to ts_headline
+HIGHLIGHT_START = '⟦'
+HIGHLIGHT_STOP = '⟧'
+
+# Field weights mirror ts_rank's default {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}
+FIELD_WEIGHTS = {
+    'company_name': 1.0,
+    'job_title': 1.0,
+    'focus_areas': 0.4,
+    'cover_letter': 0.2,
+}
+SNIPPET_FIELDS = ('focus_areas', 'cover_letter')
+SNIPPET_WORDS = 20
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have i in is it my of on or our that the this to was we were will with you your'.split()
+)
+
+
+def _stem(token):
+    # Crude suffix stripping so "engineering"/"engineer"/"engineers" meet, like the english text search config
+    for _ in range(2):
+        for suffix in ('ing', 'ers', 'er', 'ed', 's'):
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3 and not token.endswith('ss'):
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def tokenize(text):
+    return [_stem(t) for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+class SubmissionSearchIndex:
+    """In-process inverted index over submission text, used when Postgres full-text search is unavailable.
+
+    Ranking is weighted term frequency times idf; all query terms must match.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, row):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(row.get(field)):
+                weights[term] = weights.get(term, 0.0) + weight
+        doc = {
+            'id': doc_id,
+            'company_name': row.get('company_name'),
+            'job_title': row.get('job_title'),
+            'created_at': row.get('created_at'),
+            'snippet_text': ' '.join(row.get(f) or '' for f in SNIPPET_FIELDS),
+            'terms': weights,
+        }
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._docs[doc_id] = doc
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[doc_id] = weight
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc['terms']:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query, limit=20, offset=0):
+        """Return (hits, has_more) where each hit has id, company_name, job_title, created_at, rank and snippet."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], False
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return [], False
+            total_docs = len(self._docs)
+            candidates = set.intersection(*(set(p) for p in postings))
+            scored = []
+            for doc_id in candidates:
+                score = sum(p[doc_id] * (1.0 + math.log(total_docs / len(p))) for p in postings)
+                scored.append((score, doc_id))
+            scored.sort(key=lambda s: (s[0], self._docs[s[1]]['created_at'] or ''), reverse=True)
+            page = scored[offset:offset + limit + 1]
+            hits = []
+            for score, doc_id in page[:limit]:
+                doc = self._docs[doc_id]
+                hits.append({
+                    'id': doc_id,
+                    'company_name': doc['company_name'],
+                    'job_title': doc['job_title'],
+                    'created_at': doc['created_at'],
+                    'rank': round(score, 4),
+                    'snippet': make_snippet(doc['snippet_text'], set(terms)),
+                })
+        return hits, len(page) > limit
+
+
+def make_snippet(text, stemmed_terms, width=SNIPPET_WORDS):
+    words = (text or '').split()
+    matches = [i for i, w in enumerate(words) if any(_stem(t) in stemmed_terms for t in TOKEN_RE.findall(w.lower()))]
+    if not matches:
+        return ' '.join(words[:width])
+    start = max(matches[0] - width // 4, 0)
+    matches = set(matches)
+    window = words[start:start + width]
+    highlighted = [
+        f'{HIGHLIGHT_START}{w}{HIGHLIGHT_STOP}' if start + i in matches else w
+        for i, w in enumerate(window)
+    ]
+    return ' '.join(highlighted)
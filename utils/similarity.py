@@ -0,0 +1,114 @@
+import hashlib
+import random
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+SHINGLE_SIZE = 5
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# 16 bands of 4 rows: pairs at Jaccard 0.8 share a band with probability ~0.999
+NUM_PERM = 64
+LSH_BANDS = 16
+
+TRACKING_PARAM_PREFIXES = ('utm_', 'gh_', 'trk', 'ref', 'src', 'source', 'fbclid', 'gclid', 'mc_', 'lever-', 'jobsource')
+# Lines that appear on most postings and say nothing about the role itself
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'equal (employment )?opportunity',
+        r'reasonable accommodation',
+        r'without regard to (race|color|religion)',
+        r'e-?verify',
+        r'apply (now|today|for this job)',
+        r'share this (job|posting)',
+        r'privacy (notice|policy)',
+    )
+]
+URL_RE = re.compile(r'https?://\S+')
+NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def _strip_tracking_params(match):
+    url = match.group(0)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(TRACKING_PARAM_PREFIXES)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def normalize_job_description(text):
+    """Lowercase, drop boilerplate lines and tracking params, and collapse whitespace/punctuation."""
+    if not text:
+        return ''
+    text = URL_RE.sub(_strip_tracking_params, text)
+    lines = [line for line in text.splitlines() if not any(p.search(line) for p in BOILERPLATE_PATTERNS)]
+    return NON_WORD_RE.sub(' ', '\n'.join(lines).lower()).strip()
+
+
+def text_fingerprint(text):
+    """Stable hash of a text with whitespace differences ignored."""
+    return hashlib.sha1(' '.join((text or '').split()).encode('utf-8')).hexdigest()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = normalize_job_description(text).split()
+    if len(words) < size:
+        return {_hash_token(' '.join(words))} if words else set()
+    return {_hash_token(' '.join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+def _hash_token(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _permutations(num_perm):
+    rng = random.Random(1)
+    return [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def minhash_signature(shingle_set):
+    if not shingle_set:
+        return [MAX_HASH] * NUM_PERM
+    return [min(((a * s + b) % MERSENNE_PRIME) & MAX_HASH for s in shingle_set) for a, b in _PERMUTATIONS]
+
+
+def lsh_band_hashes(text, group=None):
+    """MinHash + LSH bucket keys for a job description, one signed 64-bit int per band.
+
+    Stored with each submission (submission.job_description_bands) so near-duplicate
+    candidates are found with an array overlap query instead of re-hashing past postings.
+    `group` (the resume fingerprint) is mixed into every key, so only submissions made
+    with the same resume can collide.
+    """
+    signature = minhash_signature(shingles(text))
+    rows = NUM_PERM // LSH_BANDS
+    salt = (group or '').encode('utf-8')
+    keys = []
+    for band in range(LSH_BANDS):
+        values = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(b','.join(str(v).encode('ascii') for v in values), digest_size=8,
+                                 key=salt[:64], person=band.to_bytes(2, 'little')).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def rank_near_duplicates(text, candidates, threshold):
+    """Confirm LSH candidates [(key, text)] by exact shingle Jaccard; return [(key, similarity)] best first."""
+    shingle_set = shingles(text)
+    matches = []
+    for key, candidate_text in candidates:
+        similarity = jaccard(shingle_set, shingles(candidate_text))
+        if similarity >= threshold:
+            matches.append((key, similarity))
+    matches.sort(key=lambda m: (m[1], m[0]), reverse=True)
+    return matches
@@ -0,0 +1,130 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import zlib
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else on a record came from `extra=` and is emitted as a field.
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id and any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the current request id. Runs on the calling thread, before the record is queued."""
+
+    def __init__(self, get_request_id):
+        super().__init__()
+        self.get_request_id = get_request_id
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = self.get_request_id()
+        return True
+
+
+class StageSamplingFilter(logging.Filter):
+    """Keep only a `rate` fraction of INFO-and-below records from the stage loggers.
+
+    The keep/drop decision is a hash of the request id, so a sampled request keeps all of
+    its stage lines and an unsampled one keeps none. Warnings and errors always pass.
+    """
+
+    def __init__(self, rate, loggers):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.loggers = tuple(loggers)
+
+    def _is_stage(self, name):
+        return any(name == prefix or name.startswith(prefix + '.') for prefix in self.loggers)
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno > logging.INFO or not self._is_stage(record.name):
+            return True
+        request_id = getattr(record, 'request_id', None)
+        if request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(str(request_id).encode('utf-8')) / 0xFFFFFFFF < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: records are dropped (and counted) when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now, while args and exc_info are still valid,
+        # but leave formatting to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=logging.INFO, json_output=True, stage_sample_rate=1.0, stage_loggers=(),
+                      get_request_id=lambda: None, queue_size=10000, stream=None):
+    """Route all logging through a bounded queue drained by a background QueueListener.
+
+    Replaces any handlers on the root logger. Returns the started listener; it is also
+    stopped (and the queue flushed) at interpreter exit.
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter(get_request_id))
+    handler.addFilter(StageSamplingFilter(stage_sample_rate, stage_loggers))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    # QueueListener.stop() fails if called twice on older Pythons
+    if listener._thread is not None:
+        listener.stop()